@@ -1,61 +1,84 @@
+import subprocess
 import tkinter as tk
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+from io import BytesIO
 from tkinter import messagebox
 from PIL import Image, ImageTk
-import graphviz
 
-# Define State and NFA classes
-class State:
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:  # Numba is optional; regex_to_postfix is used on its own
+    njit = None
+
+# Define the NFA table: states are integer ids into parallel transition lists
+class NFATable:
     def __init__(self):
-        self.transitions = {}
-        self.is_accept = False
-
-class NFA:
-    def __init__(self, start, accept):
-        self.start = start
-        self.accept = accept
-
-# Functions to build NFA components
-def create_basic_nfa(char):
-    start = State()
-    accept = State()
-    start.transitions[char] = [accept]
-    return NFA(start, accept)
-
-def apply_concatenation(nfa1, nfa2):
-    nfa1.accept.transitions['ε'] = [nfa2.start]
-    return NFA(nfa1.start, nfa2.accept)
-
-def apply_union(nfa1, nfa2):
-    start = State()
-    accept = State()
-    start.transitions['ε'] = [nfa1.start, nfa2.start]
-    nfa1.accept.transitions['ε'] = [accept]
-    nfa2.accept.transitions['ε'] = [accept]
-    return NFA(start, accept)
-
-def apply_kleene_star(nfa):
-    start = State()
-    accept = State()
-    start.transitions['ε'] = [nfa.start, accept]
-    nfa.accept.transitions['ε'] = [nfa.start, accept]
-    return NFA(start, accept)
+        self.eps = []  # eps[s] lists the states reachable from s on ε
+        self.sym = []  # sym[s] lists the (char, state) transitions from s
+        self.start = None
+        self.finals = set()  # Accepting states
+
+    def new_state(self):
+        self.eps.append([])
+        self.sym.append([])
+        return len(self.eps) - 1
+
+    def freeze(self):
+        return FrozenNFATable(tuple(map(tuple, self.eps)), tuple(map(tuple, self.sym)),
+                              self.start, frozenset(self.finals))
+
+# Read-only NFATable, safe to hand out from a cache; works with every function that only reads a table
+FrozenNFATable = namedtuple('FrozenNFATable', ['eps', 'sym', 'start', 'finals'])
+
+# Functions to build NFA components; each fragment is a (start, accept) pair of state ids
+def create_basic_nfa(table, char):
+    start = table.new_state()
+    accept = table.new_state()
+    table.sym[start].append((char, accept))
+    return start, accept
+
+def apply_concatenation(table, nfa1, nfa2):
+    table.eps[nfa1[1]].append(nfa2[0])
+    return nfa1[0], nfa2[1]
+
+def apply_union(table, nfa1, nfa2):
+    start = table.new_state()
+    accept = table.new_state()
+    table.eps[start].extend((nfa1[0], nfa2[0]))
+    table.eps[nfa1[1]].append(accept)
+    table.eps[nfa2[1]].append(accept)
+    return start, accept
+
+def apply_kleene_star(table, nfa):
+    start = table.new_state()
+    accept = table.new_state()
+    table.eps[start].extend((nfa[0], accept))
+    table.eps[nfa[1]].extend((nfa[0], accept))
+    return start, accept
+
+# Characters accepted as regex atoms
+ALPHABET = frozenset("abcdefghijklmnopqrstuvwxyz0123456789")
 
 def regex_to_postfix(regex):
     precedence = {'*': 3, '.': 2, '|': 1}
     output = []
     operators = []
-    chars = set("abcdefghijklmnopqrstuvwxyz0123456789")
+    chars = ALPHABET
 
-    new_regex = []
-    for i, char in enumerate(regex):
-        new_regex.append(char)
-        if i + 1 < len(regex) and (
-            char in chars or char == ')' or char == '*') and (
-            regex[i + 1] in chars or regex[i + 1] == '('):
-            new_regex.append('.')
-    regex = ''.join(new_regex)
+    def push_operator(op):
+        while (operators and operators[-1] != '(' and
+               precedence[operators[-1]] >= precedence[op]):
+            output.append(operators.pop())
+        operators.append(op)
 
+    # Single pass: implicit concatenation is emitted as soon as an atom or '(' follows an atom, ')' or '*'
+    prev_was_atom = False
     for char in regex:
+        if prev_was_atom and (char in chars or char == '('):
+            push_operator('.')
+
         if char in chars:
             output.append(char)
         elif char == '(':
@@ -65,126 +88,384 @@ def regex_to_postfix(regex):
                 output.append(operators.pop())
             operators.pop()
         elif char in precedence:
-            while (operators and operators[-1] != '(' and
-                   precedence[operators[-1]] >= precedence[char]):
-                output.append(operators.pop())
-            operators.append(char)
+            push_operator(char)
+        prev_was_atom = char in chars or char == ')' or char == '*'
     while operators:
         output.append(operators.pop())
 
     return ''.join(output)
 
-def thompsons_construction(regex):
-    stack = []
-    postfix = regex_to_postfix(regex)
+if njit is not None:
+    # Byte lookup tables for the compiled shunting-yard pass
+    _ATOMS = np.zeros(256, np.uint8)
+    for _char in ALPHABET:
+        _ATOMS[ord(_char)] = 1
+    _PRECEDENCE = np.zeros(256, np.uint8)
+    _PRECEDENCE[ord('*')] = 3
+    _PRECEDENCE[ord('.')] = 2
+    _PRECEDENCE[ord('|')] = 1
+
+    @njit(cache=True)
+    def _postfix_nb(buf):
+        # Same algorithm as regex_to_postfix over ASCII bytes; implicit concatenation at most doubles the length
+        output = np.empty(2 * len(buf), np.uint8)
+        operators = np.empty(2 * len(buf), np.uint8)
+        out_len = 0
+        op_len = 0
+        concat = np.uint8(ord('.'))
+        open_paren = np.uint8(ord('('))
+        close_paren = np.uint8(ord(')'))
+        star = np.uint8(ord('*'))
+        prev_was_atom = False
+        for char in buf:
+            is_atom = _ATOMS[char] == 1
+            if prev_was_atom and (is_atom or char == open_paren):
+                while (op_len > 0 and operators[op_len - 1] != open_paren and
+                       _PRECEDENCE[operators[op_len - 1]] >= _PRECEDENCE[concat]):
+                    op_len -= 1
+                    output[out_len] = operators[op_len]
+                    out_len += 1
+                operators[op_len] = concat
+                op_len += 1
+
+            if is_atom:
+                output[out_len] = char
+                out_len += 1
+            elif char == open_paren:
+                operators[op_len] = char
+                op_len += 1
+            elif char == close_paren:
+                while op_len > 0 and operators[op_len - 1] != open_paren:
+                    op_len -= 1
+                    output[out_len] = operators[op_len]
+                    out_len += 1
+                if op_len == 0:
+                    raise IndexError("pop from empty list")
+                op_len -= 1
+            elif _PRECEDENCE[char] > 0:
+                while (op_len > 0 and operators[op_len - 1] != open_paren and
+                       _PRECEDENCE[operators[op_len - 1]] >= _PRECEDENCE[char]):
+                    op_len -= 1
+                    output[out_len] = operators[op_len]
+                    out_len += 1
+                operators[op_len] = char
+                op_len += 1
+            prev_was_atom = is_atom or char == close_paren or char == star
+        while op_len > 0:
+            op_len -= 1
+            output[out_len] = operators[op_len]
+            out_len += 1
+        return output[:out_len]
+
+# Shorter regexes are converted faster by the interpreter than by a call into compiled code
+NUMBA_MIN_LENGTH = 256
+
+def to_postfix(regex):
+    if njit is not None and len(regex) >= NUMBA_MIN_LENGTH and regex.isascii():
+        return _postfix_nb(np.frombuffer(regex.encode('ascii'), np.uint8)).tobytes().decode('ascii')
+    return regex_to_postfix(regex)  # Numba's str support is limited, so non-ASCII input stays in Python
+
+# Postfix operator handlers; each pops its operands from the stack and pushes the result
+def _concat(table, stack):
+    nfa2 = stack.pop()
+    nfa1 = stack.pop()
+    stack.append(apply_concatenation(table, nfa1, nfa2))
+
+def _union(table, stack):
+    nfa2 = stack.pop()
+    nfa1 = stack.pop()
+    stack.append(apply_union(table, nfa1, nfa2))
+
+def _star(table, stack):
+    stack.append(apply_kleene_star(table, stack.pop()))
+
+HANDLERS = {'.': _concat, '|': _union, '*': _star}
+
+def thompsons_construction(regex, _stack=[]):
+    # The default list is deliberately shared so repeated calls reuse one fragment stack
+    table = NFATable()
+    stack = _stack
+    stack.clear()
+    postfix = to_postfix(regex)
 
     for char in postfix:
-        if char.isalnum():  
-            stack.append(create_basic_nfa(char))
-        elif char == '.':  
-            nfa2 = stack.pop()
-            nfa1 = stack.pop()
-            stack.append(apply_concatenation(nfa1, nfa2))
-        elif char == '|':  
-            nfa2 = stack.pop()
-            nfa1 = stack.pop()
-            stack.append(apply_union(nfa1, nfa2))
-        elif char == '*':  
-            nfa = stack.pop()
-            stack.append(apply_kleene_star(nfa))
+        handler = HANDLERS.get(char)
+        if handler:
+            handler(table, stack)
+        elif char in ALPHABET:
+            stack.append(create_basic_nfa(table, char))
 
     if len(stack) != 1:
         raise ValueError("Invalid regular expression: remaining items on the stack after processing.")
     
-    return stack[0]
-
-def visualize_nfa(nfa, filename='nfa'):
-    dot = graphviz.Digraph(format='png')
-    dot.attr(rankdir='LR')  # Set horizontal layout
-    dot.attr(dpi='300')  # Increase DPI for higher resolution
-    state_ids = {}
-
-    def get_state_id(state):
-        if state not in state_ids:
-            state_ids[state] = f's{len(state_ids)}'
-        return state_ids[state]
-
-    def add_state(state, is_initial=False, is_final=False):
-        state_id = get_state_id(state)
-        if is_initial:
-            fillcolor = 'lightgreen'
-        elif is_final:
-            fillcolor = 'lightgreen'
-        else:
-            fillcolor = 'lightblue'  # Very light pink for non-initial, non-final states
-
-        shape = 'doublecircle' if state.is_accept else 'circle'
-        dot.node(state_id, shape=shape, style='filled', fillcolor=fillcolor)
-
-        for char, next_states in state.transitions.items():
-            for next_state in next_states:
-                dot.edge(state_id, get_state_id(next_state), label=char)
-
-    def traverse(state, visited, is_initial=False):
-        if state in visited:
-            return
-        visited.add(state)
-        add_state(state, is_initial=is_initial, is_final=state.is_accept)
-        for next_states in state.transitions.values():
-            for next_state in next_states:
-                traverse(next_state, visited, is_initial=False)
-
-    # Set the initial state as light blue
-    traverse(nfa.start, set(), is_initial=True)
-    dot.render(filename, cleanup=True)
+    table.start, accept = stack[0]
+    table.finals.add(accept)
+    return table
+
+def iter_states(mask):
+    # Yield the state ids in a bitmask, lowest first
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def epsilon_closures(table):
+    # closures[s] is the bitmask of states reachable from s through ε-transitions alone
+    closures = []
+    for state in range(len(table.eps)):
+        mask = 1 << state
+        stack = [state]
+        while stack:
+            for next_state in table.eps[stack.pop()]:
+                if not mask >> next_state & 1:
+                    mask |= 1 << next_state
+                    stack.append(next_state)
+        closures.append(mask)
+    return closures
+
+def reachable_states(nfa):
+    # Bitmask of every state reachable from the start over ε and char transitions
+    reachable = 1 << nfa.start
+    stack = [nfa.start]
+    while stack:
+        state = stack.pop()
+        for next_state in [*nfa.eps[state], *(next_state for _, next_state in nfa.sym[state])]:
+            if not reachable >> next_state & 1:
+                reachable |= 1 << next_state
+                stack.append(next_state)
+    return reachable
+
+def simulate(nfa, text):
+    # Run the NFA over text, tracking the set of active states as a bitmask.
+    # Used by the GUI's Test Match button, on the DFA from regex_to_dfa()
+    closures = epsilon_closures(nfa)
+    final_mask = sum(1 << state for state in nfa.finals)
+    current = closures[nfa.start]
+    for c in text:
+        step = 0
+        for state in iter_states(current):
+            for char, next_state in nfa.sym[state]:
+                if char == c:
+                    step |= closures[next_state]
+        if not step:
+            return False
+        current = step
+    return bool(current & final_mask)
+
+def thompsons_to_glushkov(nfa):
+    # Fold every char transition through the ε-closures, leaving an ε-free table whose states are
+    # the start state plus each char-transition target (the Glushkov positions)
+    closures = epsilon_closures(nfa)
+    final_mask = sum(1 << state for state in nfa.finals)
+
+    ids = {nfa.start: 0}
+    for transitions in nfa.sym:
+        for _, next_state in transitions:
+            ids.setdefault(next_state, len(ids))
+
+    table = NFATable()
+    for _ in ids:
+        table.new_state()
+    table.start = 0
+    for state, new_id in ids.items():
+        for reached in iter_states(closures[state]):
+            table.sym[new_id].extend((char, ids[next_state]) for char, next_state in nfa.sym[reached])
+        if closures[state] & final_mask:
+            table.finals.add(new_id)
+    return table
+
+def subset_construction(nfa):
+    # Determinize an ε-free table; each DFA state stands for a bitmask of NFA states
+    final_mask = sum(1 << state for state in nfa.finals)
+    dfa = NFATable()
+    dfa.start = dfa.new_state()
+    ids = {1 << nfa.start: dfa.start}
+    pending = [1 << nfa.start]
+
+    while pending:
+        mask = pending.pop()
+        state = ids[mask]
+        if mask & final_mask:
+            dfa.finals.add(state)
+
+        moves = {}
+        for reached in iter_states(mask):
+            for char, next_state in nfa.sym[reached]:
+                moves[char] = moves.get(char, 0) | 1 << next_state
+        for char, target in moves.items():
+            if target not in ids:
+                ids[target] = dfa.new_state()
+                pending.append(target)
+            dfa.sym[state].append((char, ids[target]))
+    return dfa
+
+@lru_cache(maxsize=128)
+def regex_to_dfa(regex):
+    # Frozen because every caller, including the GUI's Test Match button, shares the cached table
+    return subset_construction(thompsons_to_glushkov(thompsons_construction(regex))).freeze()
+
+# Precompiled DOT templates, so states and edges are formatted straight into a byte buffer
+DOT_HEADER = b'digraph {\nrankdir=LR;\ndpi=300;\n'  # Horizontal layout, higher DPI for resolution
+NODE_ACCEPT = b's%d [shape=doublecircle,style=filled,fillcolor=%s];\n'
+NODE = b's%d [shape=circle,style=filled,fillcolor=%s];\n'
+EDGE = b's%d -> s%d [label="%s"];\n'
+EPSILON = 'ε'.encode()
+DOT_ESCAPE = str.maketrans({'"': '\\"', '\\': '\\\\', '\n': '\\n'})  # Keeps labels valid inside quotes
+
+def add_state(buf, table, state, is_initial=False, is_final=False):
+    if is_initial:
+        fillcolor = b'lightgreen'
+    elif is_final:
+        fillcolor = b'lightgreen'
+    else:
+        fillcolor = b'lightblue'  # Very light pink for non-initial, non-final states
+
+    buf += (NODE_ACCEPT if is_final else NODE) % (state, fillcolor)
+
+    for char, next_state in table.sym[state]:
+        buf += EDGE % (state, next_state, char.translate(DOT_ESCAPE).encode())
+    for next_state in table.eps[state]:
+        buf += EDGE % (state, next_state, EPSILON)
+
+def render_dot(source, fmt='png'):
+    # Stream the DOT source through Graphviz's stdin and read the output back, without touching disk
+    result = subprocess.run(['dot', f'-T{fmt}'], input=source, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, check=False)
+    if result.returncode != 0:
+        raise RuntimeError(f"Graphviz failed: {result.stderr.decode(errors='replace').strip()}")
+    return result.stdout
+
+def visualize_nfa(nfa):
+    buf = bytearray(DOT_HEADER)
+
+    for state in iter_states(reachable_states(nfa)):
+        add_state(buf, nfa, state, is_initial=state == nfa.start, is_final=state in nfa.finals)
+
+    buf += b'}\n'
+    return render_dot(bytes(buf))
 
 # Tkinter GUI Code
+IMAGE_CACHE_SIZE = 32
+NFA_IMAGE_CACHE_BYTES = 64 * 1024 * 1024  # Full-size 300 DPI renders are large, so cap them by decoded size
+SIZE_BUCKET = 64  # Window sizes within the same 64px bucket share cached frames
+BACKGROUND = 'white'  # Matches the Graphviz page colour around the thumbnail
+
+# LRU caches: regex -> full-size NFA image (bounded by NFA_IMAGE_CACHE_BYTES), and
+# (regex, frame size) -> thumbnail centred in a frame (bounded by IMAGE_CACHE_SIZE)
+nfa_images = OrderedDict()
+nfa_frames = OrderedDict()
+
+photo = None  # Single PhotoImage reused for every click; frames are pasted into it
+
+def cache_get(cache, key):
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+def cache_put(cache, key, value):
+    cache[key] = value
+    cache.move_to_end(key)
+    if len(cache) > IMAGE_CACHE_SIZE:
+        cache.popitem(last=False)
+
+def image_bytes(img):
+    return img.width * img.height * len(img.getbands())
+
+def cache_put_image(regex, img):
+    # An image bigger than the whole budget is not kept; otherwise evict the oldest until it fits
+    size = image_bytes(img)
+    if size > NFA_IMAGE_CACHE_BYTES:
+        return
+    total = sum(image_bytes(cached) for cached in nfa_images.values())
+    while nfa_images and total + size > NFA_IMAGE_CACHE_BYTES:
+        total -= image_bytes(nfa_images.popitem(last=False)[1])
+    nfa_images[regex] = img
+
+def show_frame(frame):
+    global photo
+    # Only allocate a new Tk image when the window moves to a different size bucket
+    if photo is None or (photo.width(), photo.height()) != frame.size:
+        photo = ImageTk.PhotoImage('RGB', frame.size)
+        img_label.config(image=photo)
+    photo.paste(frame)
+
 def on_generate_click():
     regex = regex_entry.get()  # Get regex input from entry widget
     try:
-        # Perform NFA generation and visualization
-        nfa = thompsons_construction(regex)
-        nfa.accept.is_accept = True
-        visualize_nfa(nfa, 'nfa')
+        # Dynamically resize the image to fit in the GUI window
+        window_width = root.winfo_width()
+        window_height = root.winfo_height()
+        max_width = max(int(window_width * 0.8) // SIZE_BUCKET, 1) * SIZE_BUCKET
+        max_height = max(int(window_height * 0.6) // SIZE_BUCKET, 1) * SIZE_BUCKET
+
+        key = (regex, max_width, max_height)
+        frame = cache_get(nfa_frames, key)
+        if frame is None:
+            full_img = cache_get(nfa_images, regex)
+            if full_img is None:
+                # Perform NFA generation and visualization
+                nfa = thompsons_construction(regex)
+                full_img = Image.open(BytesIO(visualize_nfa(nfa)))
+                full_img.load()
+                cache_put_image(regex, full_img)
+
+            thumbnail = full_img.copy()  # thumbnail() resizes in place, keep the cached original intact
+            thumbnail.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+            frame = Image.new('RGB', (max_width, max_height), BACKGROUND)
+            frame.paste(thumbnail, ((max_width - thumbnail.width) // 2, (max_height - thumbnail.height) // 2))
+            cache_put(nfa_frames, key, frame)
 
         # Display success message in terminal output
         terminal_output.insert(tk.END, f"Successfully generated NFA for regex: {regex}\n")
 
-        # Load and display the NFA image
-        img = Image.open('nfa.png')
-        # Dynamically resize the image to fit in the GUI window
-        window_width = root.winfo_width()
-        window_height = root.winfo_height()
-        max_width = int(window_width * 0.8)
-        max_height = int(window_height * 0.6)
-        img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
-        img = ImageTk.PhotoImage(img)
-        img_label.config(image=img)
-        img_label.image = img  # Keep a reference to prevent garbage collection
+        # Display the NFA image
+        show_frame(frame)
 
     except Exception as e:
         terminal_output.insert(tk.END, f"Error: {e}\n")
 
-# Create Tkinter window
-root = tk.Tk()
-root.title("NFA Visualization")
-root.geometry("1000x700")  # Initial window size
+def on_match_click():
+    regex = regex_entry.get()
+    text = test_entry.get()
+    try:
+        # Match on the cached ε-free DFA, so each input character is a single transition lookup
+        matched = simulate(regex_to_dfa(regex), text)
+        verdict = "matches" if matched else "does not match"
+        terminal_output.insert(tk.END, f"'{text}' {verdict} regex: {regex}\n")
+    except Exception as e:
+        terminal_output.insert(tk.END, f"Error: {e}\n")
+
+if __name__ == "__main__":  # Importing the module gives the NFA helpers without opening the window
+    # Create Tkinter window
+    root = tk.Tk()
+    root.title("NFA Visualization")
+    root.geometry("1000x700")  # Initial window size
+
+    # Create Widgets
+    regex_label = tk.Label(root, text="Enter Regular Expression:")
+    regex_label.pack()
+
+    regex_entry = tk.Entry(root, width=40)
+    regex_entry.pack()
+
+    generate_button = tk.Button(root, text="Generate NFA", command=on_generate_click)
+    generate_button.pack()
 
-# Create Widgets
-regex_label = tk.Label(root, text="Enter Regular Expression:")
-regex_label.pack()
+    test_label = tk.Label(root, text="Enter Test String:")
+    test_label.pack()
 
-regex_entry = tk.Entry(root, width=40)
-regex_entry.pack()
+    test_entry = tk.Entry(root, width=40)
+    test_entry.pack()
 
-generate_button = tk.Button(root, text="Generate NFA", command=on_generate_click)
-generate_button.pack()
+    match_button = tk.Button(root, text="Test Match", command=on_match_click)
+    match_button.pack()
 
-terminal_output = tk.Text(root, height=10, width=50)
-terminal_output.pack()
+    terminal_output = tk.Text(root, height=10, width=50)
+    terminal_output.pack()
 
-img_label = tk.Label(root)
-img_label.pack()
+    img_label = tk.Label(root)
+    img_label.pack()
 
-# Run the Tkinter main loop
-root.mainloop()
\ No newline at end of file
+    # Run the Tkinter main loop
+    root.mainloop()
@@ -1,19 +1,31 @@
+import hashlib
+import itertools
+import multiprocessing
+import queue
+import re
+import subprocess
 import tkinter as tk
 from tkinter import messagebox
 from collections import defaultdict
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Set, FrozenSet, Iterator, Optional
 import networkx as nx
 import matplotlib.pyplot as plt
 
 
+Production = Tuple[str, ...]
+
+# A non-terminal is an uppercase letter with optional primes (A, A'); any other character is a terminal
+SYMBOL_PATTERN = re.compile(r"[A-Z]'*|.")
+
+
 def parse_grammar(grammar_rules: List[str]) -> dict:
-    """Parses grammar rules into a dictionary."""
+    """Parses grammar rules into a dictionary of productions, each a tuple of symbols."""
     grammar = defaultdict(list)
     for rule in grammar_rules:
         head, productions = rule.split("->")
         head = head.strip()
         for prod in productions.split("|"):
-            grammar[head].append(prod.strip())
+            grammar[head].append(tuple(SYMBOL_PATTERN.findall(prod.strip())))
     return grammar
 
 
@@ -27,101 +39,348 @@ def eliminate_left_recursion(grammar: dict) -> dict:
             B = non_terminals[j]
             new_rules = []
             for rule in grammar[A]:
-                if rule.startswith(B):
+                if rule[:1] == (B,):
                     for b_rule in grammar[B]:
-                        new_rules.append(b_rule + rule[len(B):])
+                        new_rules.append(b_rule + rule[1:])
                 else:
                     new_rules.append(rule)
             grammar[A] = new_rules
-        left_recursive = [rule for rule in grammar[A] if rule.startswith(A)]
-        non_left_recursive = [rule for rule in grammar[A] if not rule.startswith(A)]
+        left_recursive = [rule for rule in grammar[A] if rule[:1] == (A,)]
+        non_left_recursive = [rule for rule in grammar[A] if rule[:1] != (A,)]
 
         if left_recursive:
             A_prime = A + "'"
-            new_grammar[A] = [rule + A_prime for rule in non_left_recursive]
-            new_grammar[A_prime] = [rule[len(A):] + A_prime for rule in left_recursive] + ["ε"]
+            new_grammar[A] = [rule + (A_prime,) for rule in non_left_recursive]
+            new_grammar[A_prime] = [rule[1:] + (A_prime,) for rule in left_recursive] + [("ε",)]
         else:
             new_grammar[A] = grammar[A]
 
     return new_grammar
 
 
-def generate_parse_trees(grammar: dict, symbol: str, target: str, position: int, memo: Dict = None) -> List[Tuple[str, List]]:
-    """Generates parse trees for the given symbol and target string with memoization."""
+Node = Tuple[str, int, int]
+Forest = Dict[Node, List[Tuple[Node, ...]]]
+
+# End positions of a symbol that derives nothing at a position; also the starting seed of a cyclic entry
+_NEG: FrozenSet[int] = frozenset()
+
+
+def compute_first(grammar: dict) -> Dict[str, Set[str]]:
+    """Computes FIRST sets by fixpoint iteration; "ε" in a set marks a nullable non-terminal."""
+    first = defaultdict(set)
+    changed = True
+    while changed:
+        changed = False
+        for head, productions in grammar.items():
+            for production in productions:
+                new_first = sequence_first(production, first)
+                if not new_first <= first[head]:
+                    first[head] |= new_first
+                    changed = True
+    return first
+
+
+def sequence_first(production: Production, first: Dict[str, Set[str]]) -> Set[str]:
+    """Returns the terminals that can begin `production`, plus "ε" if it can derive the empty string."""
+    result = set()
+    for sym in production:
+        if sym == "ε":
+            continue
+        if not sym[0].isupper():
+            result.add(sym)
+            return result
+        result |= first.get(sym, set()) - {"ε"}
+        if "ε" not in first.get(sym, ()):
+            return result
+    result.add("ε")
+    return result
+
+
+def predict(grammar: dict, first: Dict[str, Set[str]], symbol: str, lookahead: Optional[str],
+            predictions: Dict[Tuple[str, Optional[str]], List[Production]]) -> List[Production]:
+    """Returns the productions of `symbol` that can match at `lookahead`, caching the filter per (symbol, lookahead)."""
+    key = (symbol, lookahead)
+    if key not in predictions:
+        predictions[key] = [production for production in grammar.get(symbol, [])
+                            if lookahead in (starts := sequence_first(production, first)) or "ε" in starts]
+    return predictions[key]
+
+
+class _RecognitionPass:
+    """One pass of the recognizer over the target string.
+
+    An entry whose computation read an entry still being computed (a cycle) is only provisional: its ends
+    go to `seeds` and are grown on the next pass. Entries that never read a provisional value are final
+    and go to `memo`."""
+
+    def __init__(self, grammar: dict, target: str, memo: Dict[Tuple[str, int], FrozenSet[int]], edges: Forest,
+                 first: Dict[str, Set[str]], predictions: Dict[Tuple[str, Optional[str]], List[Production]],
+                 seeds: Dict[Tuple[str, int], FrozenSet[int]]):
+        self.grammar = grammar
+        self.target = target
+        self.memo = memo
+        self.edges = edges
+        self.first = first
+        self.predictions = predictions
+        self.seeds = seeds
+        self.active = set()  # Entries being computed further up the call stack
+        self.provisional = set()  # Provisional entries already recomputed during this pass
+        self.changed = False  # Whether any provisional entry grew during this pass
+
+    def recognize(self, symbol: str, position: int) -> Tuple[FrozenSet[int], bool]:
+        """Returns the end positions for `symbol` at `position`, and whether they are final."""
+        key = (symbol, position)
+        if key in self.memo:
+            return self.memo[key], True
+        if key in self.active or key in self.provisional:
+            return self.seeds.get(key, _NEG), False
+
+        self.active.add(key)
+        final = True
+        target = self.target
+        # Skip productions whose FIRST set rules out the next character
+        lookahead = target[position] if position < len(target) else None
+        ends = set()
+        splits = {}
+        for production in predict(self.grammar, self.first, symbol, lookahead, self.predictions):
+            # Maps each reachable end position to the child sequences that reach it
+            frontier = {position: [()]}
+
+            for sym in production:
+                next_frontier = defaultdict(list)
+                for current_pos, children in frontier.items():
+                    if sym == "ε":  # Empty production consumes nothing
+                        spans = [(sym, current_pos, current_pos)]
+                    elif sym[0].isupper():  # Non-terminal
+                        sub_ends, sub_final = self.recognize(sym, current_pos)
+                        final = final and sub_final
+                        spans = [(sym, current_pos, end) for end in sub_ends]
+                    elif current_pos < len(target) and target[current_pos] == sym:  # Terminal
+                        spans = [(sym, current_pos, current_pos + 1)]
+                    else:
+                        continue
+                    for span in spans:
+                        next_frontier[span[2]].extend(child + (span,) for child in children)
+                frontier = next_frontier
+                if not frontier:
+                    break
+
+            for end, children in frontier.items():
+                ends.add(end)
+                splits.setdefault((symbol, position, end), []).extend(children)
+        self.active.remove(key)
+
+        # A recomputation covers every split of this entry, so it replaces what earlier passes recorded
+        self.edges.update(splits)
+        ends = frozenset(ends)
+        if final:
+            self.memo[key] = ends
+        else:
+            if ends != self.seeds.get(key, _NEG):
+                self.changed = True
+            self.seeds[key] = ends
+            self.provisional.add(key)
+        return ends, final
+
+
+def recognize(grammar: dict, symbol: str, target: str, position: int,
+              memo: Dict[Tuple[str, int], FrozenSet[int]], edges: Forest,
+              first: Dict[str, Set[str]], predictions: Dict[Tuple[str, Optional[str]], List[Production]]) -> FrozenSet[int]:
+    """Returns the end positions reachable from `position` by deriving `symbol`, recording production splits in `edges`.
+
+    Cyclic entries are grown from empty seeds until a pass leaves them unchanged; only final entries are added to `memo`."""
+    seeds = {}
+    while True:
+        recognition = _RecognitionPass(grammar, target, memo, edges, first, predictions, seeds)
+        ends, _ = recognition.recognize(symbol, position)
+        if not recognition.changed:
+            # Nothing grew, so every provisional entry of this pass is at its fixpoint
+            for key in recognition.provisional:
+                memo[key] = seeds[key]
+            return ends
+
+
+def iter_trees(edges: Forest, node: Node, path: FrozenSet[Node] = frozenset()) -> Iterator[Tuple[str, List]]:
+    """Lazily yields every parse tree rooted at `node` from the shared forest.
+
+    Cyclic grammars give cyclic forests, so derivations that revisit a node on their own `path` are skipped."""
+    if not node[0][0].isupper():  # Terminal or ε leaf
+        yield (node[0], [])
+        return
+    path = path | {node}
+    for children in edges.get(node, []):
+        if any(child in path for child in children):
+            continue
+        for subtrees in combine_subtrees(edges, children, path):
+            yield (node[0], subtrees)
+
+
+def combine_subtrees(edges: Forest, children: Tuple[Node, ...], path: FrozenSet[Node] = frozenset()) -> Iterator[List[Tuple]]:
+    """Lazily yields all possible subtree arrangements for a sequence of forest nodes."""
+    # itertools.product would read every child's trees up front, so recurse to stay lazy
+    if not children:
+        yield []
+        return
+    for first in iter_trees(edges, children[0], path):
+        for rest in combine_subtrees(edges, children[1:], path):
+            yield [first] + rest
+
+
+def generate_parse_trees(grammar: dict, symbol: str, target: str, memo: Dict = None, edges: Forest = None) -> Tuple[Forest, Node]:
+    """Builds the shared parse forest for the whole target string and returns it with its root node.
+
+    Passing the `memo` and `edges` of an earlier call on the same grammar and target reuses its work, whatever
+    start symbol that call used: `memo` only ever holds final entries, never provisional ones from a cycle."""
     if memo is None:
         memo = {}
-    if (symbol, position) in memo:
-        return memo[(symbol, position)]
-
-    # Base cases
-    if position == len(target) and symbol == "ε":
-        return [("ε", [])]  # Empty production matches end of target
-    if position >= len(target) or not symbol:
-        return []  # Invalid match
-
-    trees = []
-    for production in grammar.get(symbol, []):
-        current_pos = position
-        sub_trees = []
-        valid = True
-
-        for char in production:
-            if char.isupper():  # Non-terminal
-                sub_results = generate_parse_trees(grammar, char, target, current_pos, memo)
-                if not sub_results:
-                    valid = False
-                    break
-                sub_trees.append(sub_results)
-            else:  # Terminal
-                if current_pos < len(target) and target[current_pos] == char:
-                    sub_trees.append([(char, [])])
-                    current_pos += 1
-                else:
-                    valid = False
-                    break
+    if edges is None:
+        edges = {}
+    recognize(grammar, symbol, target, 0, memo, edges, compute_first(grammar), {})
+    return edges, (symbol, 0, len(target))
 
-        if valid:
-            for tree in combine_subtrees(sub_trees):
-                trees.append((symbol, tree))
 
-    memo[(symbol, position)] = trees
-    return trees
+def build_graph(edges: Forest, root: Node, graph: nx.Graph, node_cache: Dict[Node, int]) -> int:
+    """Builds a graph from the parse forest, adding one graph node per (symbol, start, end)."""
+    stack = [(root, None)]
+    while stack:
+        node, parent = stack.pop()
+        current_node = node_cache.get(node)
+        if current_node is None:
+            current_node = len(node_cache)
+            node_cache[node] = current_node
+            graph.add_node(current_node, label=node[0])
+            for children in reversed(edges.get(node, [])):
+                stack.extend((child, current_node) for child in reversed(children))
 
+        if parent is not None:
+            graph.add_edge(parent, current_node)
 
-def combine_subtrees(sub_trees: List[List[Tuple]]) -> List[List[Tuple]]:
-    """Combines all possible subtree arrangements."""
-    if not sub_trees:
-        return [[]]
-    first, rest = sub_trees[0], combine_subtrees(sub_trees[1:])
-    return [[f] + r for f in first for r in rest]
+    return node_cache[root]
 
 
-def build_graph(tree: Tuple[str, List], graph: nx.Graph, parent=None, node_id=0) -> int:
-    """Builds a graph from a parse tree."""
-    symbol = tree[0]
-    current_node = node_id
-    graph.add_node(current_node, label=symbol)
+# Layout positions of recently displayed graphs, keyed by a hash of their structure and labels
+_layout_cache: Dict[bytes, Dict[int, Tuple[float, float]]] = {}
+LAYOUT_CACHE_SIZE = 32
 
-    if parent is not None:
-        graph.add_edge(parent, current_node)
 
-    next_node_id = node_id + 1
-    for child in tree[1]:
-        next_node_id = build_graph(child, graph, current_node, next_node_id)
+def graph_key(graph: nx.Graph) -> bytes:
+    """Hashes the graph's edges and node labels, which fully determine its layout."""
+    return hashlib.blake2b(repr(sorted(graph.edges())).encode() + repr(sorted(graph.nodes(data="label"))).encode(),
+                           digest_size=16).digest()
 
-    return next_node_id
+
+def dot_layout(graph: nx.Graph) -> Dict[int, Tuple[float, float]]:
+    """Lays the graph out with Graphviz's plain output format, without going through pydot."""
+    lines = ["digraph {"]
+    for node, label in graph.nodes(data="label"):
+        escaped = str(label).replace("\\", "\\\\").replace('"', '\\"')
+        lines.append(f'{node} [label="{escaped}"];')
+    lines.extend(f"{u} -> {v};" for u, v in graph.edges())
+    lines.append("}")
+    result = subprocess.run(["dot", "-Tplain"], input="\n".join(lines).encode(), stdout=subprocess.PIPE, check=True)
+
+    # Plain output has one "node <name> <x> <y> ..." line per node
+    pos = {}
+    for line in result.stdout.decode().splitlines():
+        parts = line.split()
+        if parts and parts[0] == "node":
+            pos[int(parts[1])] = (float(parts[2]), float(parts[3]))
+    return pos
 
 
 def display_graph(graph: nx.Graph):
     """Displays the parse tree graph using NetworkX and Matplotlib."""
-    pos = nx.nx_pydot.graphviz_layout(graph, prog="dot")  # Ensure tree-like layout
+    key = graph_key(graph)
+    pos = _layout_cache.get(key)
+    if pos is None:
+        pos = dot_layout(graph)  # Ensure tree-like layout
+        _layout_cache[key] = pos
+        if len(_layout_cache) > LAYOUT_CACHE_SIZE:
+            del _layout_cache[next(iter(_layout_cache))]  # Drop the oldest layout
     labels = nx.get_node_attributes(graph, "label")
     nx.draw(graph, pos, with_labels=True, labels=labels, node_size=3000, node_color="skyblue", font_size=12)
     plt.show()
 
 
+# Grammar, recognizer memo and forest of the last submit, keyed by (grammar rules, test string); the memo
+# holds only final entries, so it is shared by every start symbol submitted for that pair
+parse_cache: Dict[Tuple[Tuple[str, ...], str], Tuple[dict, Dict[Tuple[str, int], FrozenSet[int]], Forest]] = {}
+
+# Parsing runs in a worker process so the Tk main loop stays responsive; the cache above lives there
+POLL_INTERVAL_MS = 50
+TREE_COUNT_LIMIT = 100  # Trees are enumerated lazily, so counting stops once this many are found
+
+
+def _do_parse(grammar_rules: List[str], start_symbol: str, test_string: str) -> Tuple[Forest, Node]:
+    """Parses the test string in the worker process and returns the picklable forest and its root node."""
+    key = (tuple(grammar_rules), test_string)
+    if key not in parse_cache:
+        parse_cache.clear()  # Only the most recent grammar and string are kept
+        grammar = parse_grammar(grammar_rules)
+        grammar = eliminate_left_recursion(grammar)
+        parse_cache[key] = (grammar, {}, {})
+    grammar, memo, edges = parse_cache[key]
+
+    return generate_parse_trees(grammar, start_symbol, test_string, memo, edges)
+
+
+def _worker_loop(requests: multiprocessing.Queue, results: multiprocessing.Queue):
+    """Runs in the worker process: parses each request and sends back ("ok", result) or ("error", message)."""
+    while True:
+        args = requests.get()
+        try:
+            results.put(("ok", _do_parse(*args)))
+        except Exception as e:
+            results.put(("error", str(e)))
+
+
+class ParseWorker:
+    """A single long-lived parser process that can be terminated mid-parse and is restarted on demand."""
+
+    def __init__(self):
+        self.process = None
+        self.requests = None
+        self.results = None
+
+    def submit(self, grammar_rules: List[str], start_symbol: str, test_string: str):
+        """Sends a parse request, starting a fresh process if there is none or the last one died."""
+        if self.process is None or not self.process.is_alive():
+            self.terminate()
+            self.requests = multiprocessing.Queue()
+            self.results = multiprocessing.Queue()
+            self.process = multiprocessing.Process(target=_worker_loop, args=(self.requests, self.results), daemon=True)
+            self.process.start()
+        self.requests.put((grammar_rules, start_symbol, test_string))
+
+    def poll(self) -> Optional[Tuple[str, object]]:
+        """Returns the pending request's outcome, or None while it is still running."""
+        try:
+            return self.results.get_nowait()
+        except queue.Empty:
+            if not self.process.is_alive():
+                return ("error", "The parser process exited unexpectedly.")
+            return None
+
+    def terminate(self):
+        """Stops the worker process, abandoning any parse in progress and its cache."""
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join()
+            self.process = None
+
+
+_worker = ParseWorker()
+_request_id = 0  # Identifies the request whose result the GUI is waiting for
+
+
+def _set_busy(busy: bool):
+    submit_button.config(state=tk.DISABLED if busy else tk.NORMAL)
+    cancel_button.config(state=tk.NORMAL if busy else tk.DISABLED)
+
+
 def on_submit():
     """Handles the submit action from the GUI."""
+    global _request_id
     grammar_rules = input_text.get("1.0", "end-1c").splitlines()
     start_symbol = start_symbol_entry.get()
     test_string = test_string_entry.get()
@@ -130,19 +389,59 @@ def on_submit():
         messagebox.showerror("Input Error", "Please provide grammar rules, start symbol, and test string.")
         return
 
+    _set_busy(True)
     try:
-        grammar = parse_grammar(grammar_rules)
-        grammar = eliminate_left_recursion(grammar)
+        _worker.submit(grammar_rules, start_symbol, test_string)
+    except Exception as e:
+        _worker.terminate()  # Start over with a fresh process on the next submit
+        _set_busy(False)
+        messagebox.showerror("Error", f"Could not start the parser: {e}")
+        return
+    _request_id += 1
+    root.after(POLL_INTERVAL_MS, _poll, _request_id, test_string)
+
+
+def on_cancel():
+    """Stops the running parse; the next submit starts a new worker process."""
+    global _request_id
+    _request_id += 1  # Tells the pending _poll to stop
+    _worker.terminate()
+    _set_busy(False)
 
-        parse_trees = generate_parse_trees(grammar, start_symbol, test_string, 0)
-        if not parse_trees:
+
+def on_close():
+    """Terminates the worker so closing the window never waits for a parse to finish."""
+    _worker.terminate()
+    root.destroy()
+
+
+def _poll(request_id: int, test_string: str):
+    """Waits for the worker's parse without blocking Tk, then shows the result."""
+    if request_id != _request_id:  # Cancelled
+        return
+    outcome = _worker.poll()
+    if outcome is None:
+        root.after(POLL_INTERVAL_MS, _poll, request_id, test_string)
+        return
+    _set_busy(False)
+
+    status, result = outcome
+    if status == "error":  # A dead worker is restarted by the next submit
+        messagebox.showerror("Error", f"An error occurred: {result}")
+        return
+
+    try:
+        edges, root_node = result
+        if root_node not in edges:
             messagebox.showinfo("Result", f"No valid parse tree for the string '{test_string}'.")
             return
 
-        messagebox.showinfo("Result", f"Valid parse trees for the string '{test_string}'.\nGenerating graph...")
+        count = sum(1 for _ in itertools.islice(iter_trees(edges, root_node), TREE_COUNT_LIMIT + 1))
+        found = f"more than {TREE_COUNT_LIMIT}" if count > TREE_COUNT_LIMIT else str(count)
+        messagebox.showinfo("Result", f"Found {found} valid parse tree(s) for the string '{test_string}'.\n"
+                                      "Generating graph...")
         graph = nx.DiGraph()  # Use DiGraph to ensure directed edges
-        for tree in parse_trees:
-            build_graph(tree, graph)
+        build_graph(edges, root_node, graph, {})
 
         display_graph(graph)
 
@@ -150,28 +449,33 @@ def on_submit():
         messagebox.showerror("Error", f"An error occurred: {e}")
 
 
-# Setting up the Tkinter GUI
-root = tk.Tk()
-root.title("Parse Tree Generator")
-
-# Grammar input area
-tk.Label(root, text="Enter Grammar Rules (Format: A -> a|bB):").pack(padx=10, pady=5)
-input_text = tk.Text(root, height=10, width=40)
-input_text.pack(padx=10, pady=5)
-
-# Start symbol input
-tk.Label(root, text="Enter Start Symbol:").pack(padx=10, pady=5)
-start_symbol_entry = tk.Entry(root, width=40)
-start_symbol_entry.pack(padx=10, pady=5)
-
-# Test string input
-tk.Label(root, text="Enter Test String:").pack(padx=10, pady=5)
-test_string_entry = tk.Entry(root, width=40)
-test_string_entry.pack(padx=10, pady=5)
-
-# Submit button
-submit_button = tk.Button(root, text="Generate Parse Tree", command=on_submit)
-submit_button.pack(padx=10, pady=10)
-
-# Start the Tkinter main loop
-root.mainloop()
\ No newline at end of file
+if __name__ == "__main__":  # Worker processes import this module, so only the main process builds the GUI
+    # Setting up the Tkinter GUI
+    root = tk.Tk()
+    root.title("Parse Tree Generator")
+    root.protocol("WM_DELETE_WINDOW", on_close)
+
+    # Grammar input area
+    tk.Label(root, text="Enter Grammar Rules (Format: A -> a|bB):").pack(padx=10, pady=5)
+    input_text = tk.Text(root, height=10, width=40)
+    input_text.pack(padx=10, pady=5)
+
+    # Start symbol input
+    tk.Label(root, text="Enter Start Symbol:").pack(padx=10, pady=5)
+    start_symbol_entry = tk.Entry(root, width=40)
+    start_symbol_entry.pack(padx=10, pady=5)
+
+    # Test string input
+    tk.Label(root, text="Enter Test String:").pack(padx=10, pady=5)
+    test_string_entry = tk.Entry(root, width=40)
+    test_string_entry.pack(padx=10, pady=5)
+
+    # Submit and cancel buttons
+    submit_button = tk.Button(root, text="Generate Parse Tree", command=on_submit)
+    submit_button.pack(padx=10, pady=10)
+    cancel_button = tk.Button(root, text="Cancel", command=on_cancel, state=tk.DISABLED)
+    cancel_button.pack(padx=10, pady=(0, 10))
+
+    # Start the Tkinter main loop
+    root.mainloop()
+    _worker.terminate()